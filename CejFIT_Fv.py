@@ -1,32 +1,91 @@
-import os, sys, sqlite3, tkinter as tk
+import os, sys, sqlite3, threading, queue, tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
-from datetime import datetime
-
-try:
-    from tkcalendar import DateEntry
-    TKCAL_AVAILABLE = True  
-except Exception:
-    TKCAL_AVAILABLE = False
+from collections import namedtuple
+from concurrent.futures import Future
+from datetime import datetime, date
 
 DB_FILENAME = 'progressive_overload.db'
 
+Exercise = namedtuple('Exercise', 'id name body_part equipment notes subgroup last_session')
+ExerciseSummary = namedtuple('ExerciseSummary', Exercise._fields + ('last_weight', 'last_reps', 'last_unit'))
+
 PRELOADED_EXERCISES = [
     ("Squat", "Back", "Barbell", "Add Elevation", "Lower Back"),
     ("Pull Ups", "Back", "Bodyweight", "Slow and Controlled", "Vertical Mower"),
     ("Hammer Curls", "Biceps", "Dumbbells", "Add Back Pulling", "Brachioradialis"),
 ]
 
+# SQL for the hot CRUD paths, hoisted to module scope so each call reuses
+# the same parsed statement instead of rebuilding the string literal
+SQL_INSERT_EXERCISE = 'INSERT INTO exercises (name, body_part, equipment, notes, subgroup) VALUES (?, ?, ?, ?, ?)'
+SQL_PRELOAD_EXERCISE = 'INSERT OR IGNORE INTO exercises (name, body_part, equipment, notes, subgroup) VALUES (?, ?, ?, ?, ?)'
+SQL_INSERT_SESSION = 'INSERT INTO sessions (exercise_id, date, notes) VALUES (?, ?, ?)'
+SQL_INSERT_SET = 'INSERT INTO sets (session_id, set_index, weight, reps, rir, unit, notes) VALUES (?, ?, ?, ?, ?, ?, ?)'
+SQL_INSERT_SETS = 'INSERT INTO sets (session_id, set_index, weight, reps, rir, unit) VALUES (?, ?, ?, ?, ?, ?)'
+SQL_SELECT_EXERCISES = '''
+    SELECT e.id, e.name, e.body_part, e.equipment, e.notes, e.subgroup,
+        (SELECT MAX(date) FROM sessions s WHERE s.exercise_id = e.id) AS last_session
+    FROM exercises e
+    ORDER BY e.body_part COLLATE NOCASE, e.name COLLATE NOCASE
+'''
+SQL_EXERCISE_SUMMARIES = '''
+    SELECT e.id, e.name, e.body_part, e.equipment, e.notes, e.subgroup,
+        s2.date AS last_session, st.weight AS last_weight, st.reps AS last_reps, st.unit AS last_unit
+    FROM exercises e
+    LEFT JOIN sessions s2 ON s2.id = (
+        SELECT id FROM sessions WHERE exercise_id = e.id ORDER BY date DESC, id DESC LIMIT 1)
+    LEFT JOIN sets st ON st.session_id = s2.id AND st.set_index = 1
+    ORDER BY e.body_part COLLATE NOCASE, e.name COLLATE NOCASE
+'''
+SQL_SEARCH_EXERCISES = '''
+    SELECT e.id, e.name, e.body_part, e.equipment, e.notes, e.subgroup,
+        (SELECT MAX(date) FROM sessions s WHERE s.exercise_id = e.id) AS last_session
+    FROM exercises e
+    WHERE lower(e.name) LIKE ? OR lower(e.body_part) LIKE ?
+        OR lower(e.notes) LIKE ? OR lower(e.subgroup) LIKE ?
+    ORDER BY e.body_part COLLATE NOCASE, e.name COLLATE NOCASE
+'''
+SQL_SESSIONS_FOR_EXERCISE = 'SELECT id, date, notes FROM sessions WHERE exercise_id=? ORDER BY date DESC'
+SQL_SESSIONS_WITH_FIRST_SET = '''
+    SELECT s.id, s.date, s.notes, st.weight, st.reps, st.rir, st.unit
+    FROM sessions s
+    LEFT JOIN sets st ON st.session_id = s.id
+        AND st.set_index = (SELECT MIN(set_index) FROM sets WHERE session_id = s.id)
+    WHERE s.exercise_id = ?
+    ORDER BY s.date DESC
+'''
+SQL_SETS_FOR_SESSION = 'SELECT set_index, weight, reps, rir, unit, notes FROM sets WHERE session_id=? ORDER BY set_index'
+SQL_LAST_SET_FOR_EXERCISE = '''
+    SELECT sets.weight, sets.reps, sets.rir, sets.unit FROM sets
+    JOIN sessions ON sets.session_id = sessions.id
+    WHERE sessions.exercise_id = ?
+    ORDER BY sessions.date DESC, sets.set_index DESC LIMIT 1
+'''
+
 # ---------------- Database ----------------
 class DatabaseManager:
     def __init__(self, db_filename=DB_FILENAME):
-        self.conn = sqlite3.connect(db_filename)
+        # connection is created here but used from the DBWorker thread only
+        self.conn = sqlite3.connect(db_filename, check_same_thread=False,
+                                    cached_statements=256)
+        self.conn.row_factory = sqlite3.Row
         self.conn.execute('PRAGMA foreign_keys = ON')
+        # WAL + NORMAL sync: commits no longer fsync the whole journal,
+        # which dominates write latency for this single-user local app
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.execute('PRAGMA synchronous = NORMAL')
+        self.conn.execute('PRAGMA temp_store = MEMORY')
+        self.conn.execute('PRAGMA cache_size = -20000')
+        self.conn.execute('PRAGMA mmap_size = 67108864')
+        # one long-lived cursor; all calls are serialized on the DB worker
+        # thread, so sharing it is safe and skips per-call allocation
+        self._c = self.conn.cursor()
         self.create_tables()
         self.ensure_columns()
         self.ensure_preloaded()
 
     def create_tables(self):
-        c = self.conn.cursor()
+        c = self._c
         c.execute('''
             CREATE TABLE IF NOT EXISTS exercises (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -59,45 +118,45 @@ class DatabaseManager:
                 FOREIGN KEY (session_id) REFERENCES sessions(id) ON DELETE CASCADE
             )
         ''')
+        # covering indexes for the history/last-set queries; without them
+        # SQLite falls back to full scans plus temp B-tree sorts
+        c.execute('CREATE INDEX IF NOT EXISTS idx_sessions_ex_date ON sessions(exercise_id, date DESC)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_sets_session_setidx ON sets(session_id, set_index)')
+        c.execute('ANALYZE')
         self.conn.commit()
 
     def ensure_columns(self):
-        c = self.conn.cursor()
-        # add legacy columns if missing
-        try:
-            c.execute("ALTER TABLE sets ADD COLUMN rir INTEGER")
-        except sqlite3.OperationalError:
-            pass
-        try:
-            c.execute("ALTER TABLE sets ADD COLUMN unit TEXT DEFAULT 'lbs'")
-        except sqlite3.OperationalError:
-            pass
-        try:
-            c.execute("ALTER TABLE sets ADD COLUMN notes TEXT DEFAULT ''")
-        except sqlite3.OperationalError:
-            pass
-        self.conn.commit()
+        # add legacy columns if missing; one commit for all ALTERs
+        with self.conn:
+            c = self._c
+            try:
+                c.execute("ALTER TABLE sets ADD COLUMN rir INTEGER")
+            except sqlite3.OperationalError:
+                pass
+            try:
+                c.execute("ALTER TABLE sets ADD COLUMN unit TEXT DEFAULT 'lbs'")
+            except sqlite3.OperationalError:
+                pass
+            try:
+                c.execute("ALTER TABLE sets ADD COLUMN notes TEXT DEFAULT ''")
+            except sqlite3.OperationalError:
+                pass
 
     def ensure_preloaded(self):
-        c = self.conn.cursor()
+        c = self._c
         c.execute('SELECT COUNT(*) FROM exercises')
         count = c.fetchone()[0]
         if count == 0:
-            for ex in PRELOADED_EXERCISES:
-                try:
-                    c.execute(
-                        'INSERT INTO exercises (name, body_part, equipment, notes, subgroup) VALUES (?, ?, ?, ?, ?)',
-                        ex
-                    )
-                except sqlite3.IntegrityError:
-                    pass
-            self.conn.commit()
+            # INSERT OR IGNORE in one transaction: no per-row commit and no
+            # per-row IntegrityError handling
+            with self.conn:
+                c.executemany(SQL_PRELOAD_EXERCISE, PRELOADED_EXERCISES)
 
     # CRUD
     def add_exercise(self, name, body_part='', equipment='', notes='', subgroup=''):
         try:
-            c = self.conn.cursor()
-            c.execute('INSERT INTO exercises (name, body_part, equipment, notes, subgroup) VALUES (?, ?, ?, ?, ?)',
+            c = self._c
+            c.execute(SQL_INSERT_EXERCISE,
                       (name.strip(), body_part.strip(), equipment.strip(), notes.strip(), subgroup.strip()))
             self.conn.commit()
             return c.lastrowid
@@ -105,66 +164,86 @@ class DatabaseManager:
             raise ValueError('Exercise already exists.')
 
     def get_exercises(self):
-        c = self.conn.cursor()
-        c.execute('''
-            SELECT e.id, e.name, e.body_part, e.equipment, e.notes, e.subgroup,
-                (SELECT MAX(date) FROM sessions s WHERE s.exercise_id = e.id) AS last_session
-            FROM exercises e
-            ORDER BY e.body_part COLLATE NOCASE, e.name COLLATE NOCASE
-        ''')
-        return c.fetchall()
+        c = self._c
+        c.execute(SQL_SELECT_EXERCISES)
+        return [Exercise(*r) for r in c.fetchall()]
+
+    def get_exercise_summaries(self):
+        # one joined query for the whole master list: each exercise with
+        # its latest session date and that session's first set, instead of
+        # a correlated MAX(date) subquery per row plus later lookups
+        c = self._c
+        c.execute(SQL_EXERCISE_SUMMARIES)
+        return [ExerciseSummary(*r) for r in c.fetchall()]
+
+    def search_exercises(self, q):
+        c = self._c
+        like = f'%{q.lower()}%'
+        c.execute(SQL_SEARCH_EXERCISES, (like, like, like, like))
+        return [Exercise(*r) for r in c.fetchall()]
 
     def update_exercise(self, id_, name, body_part, equipment, notes, subgroup):
-        c = self.conn.cursor()
+        c = self._c
         c.execute('UPDATE exercises SET name=?, body_part=?, equipment=?, notes=?, subgroup=? WHERE id=?',
                   (name.strip(), body_part.strip(), equipment.strip(), notes.strip(), subgroup.strip(), id_))
         self.conn.commit()
 
     def delete_exercise(self, id_):
-        c = self.conn.cursor()
+        c = self._c
         c.execute('DELETE FROM exercises WHERE id=?', (id_,))
         self.conn.commit()
 
     def add_session(self, exercise_id, date_str, notes=''):
-        c = self.conn.cursor()
-        c.execute('INSERT INTO sessions (exercise_id, date, notes) VALUES (?, ?, ?)',
-                  (exercise_id, date_str, notes.strip()))
+        c = self._c
+        c.execute(SQL_INSERT_SESSION, (exercise_id, date_str, notes.strip()))
         self.conn.commit()
         return c.lastrowid
 
     def add_set(self, session_id, set_index, weight, reps, rir=None, unit='lbs', notes=''):
-        c = self.conn.cursor()
+        c = self._c
         c.execute(
-            'INSERT INTO sets (session_id, set_index, weight, reps, rir, unit, notes) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            SQL_INSERT_SET,
             (session_id, set_index, float(weight), int(reps),
              (int(rir) if rir is not None and str(rir).strip() != '' else None), unit, (notes or '').strip()))
         self.conn.commit()
         return c.lastrowid
 
+    def add_sets(self, session_id, sets):
+        # sets is a list of dicts like the UI's set_buffer; insert them all in one transaction
+        rows = [
+            (session_id, s['idx'], float(s['weight']), int(s['reps']),
+             (int(s['rir']) if s.get('rir') is not None and str(s['rir']).strip() != '' else None),
+             s.get('unit', 'lbs'))
+            for s in sets
+        ]
+        with self.conn:
+            self.conn.executemany(SQL_INSERT_SETS, rows)
+
     def get_sessions_for_exercise(self, exercise_id):
-        c = self.conn.cursor()
-        c.execute('SELECT id, date, notes FROM sessions WHERE exercise_id=? ORDER BY date DESC', (exercise_id,))
+        c = self._c
+        c.execute(SQL_SESSIONS_FOR_EXERCISE, (exercise_id,))
+        return c.fetchall()
+
+    def get_sessions_with_first_set(self, exercise_id):
+        # one query instead of one per session: each row carries the
+        # session plus its lowest-index set (NULLs when the session has none)
+        c = self._c
+        c.execute(SQL_SESSIONS_WITH_FIRST_SET, (exercise_id,))
         return c.fetchall()
 
     def get_sets_for_session(self, session_id):
-        c = self.conn.cursor()
-        c.execute('SELECT set_index, weight, reps, rir, unit, notes FROM sets WHERE session_id=? ORDER BY set_index',
-                  (session_id,))
+        c = self._c
+        c.execute(SQL_SETS_FOR_SESSION, (session_id,))
         return c.fetchall()
 
     def delete_session(self, session_id):
-        c = self.conn.cursor()
+        c = self._c
         c.execute('DELETE FROM sessions WHERE id=?', (session_id,))
         self.conn.commit()
 
     def get_last_set_for_exercise(self, exercise_id):
-        c = self.conn.cursor()
-        c.execute('''
-            SELECT sets.weight, sets.reps, sets.rir, sets.unit FROM sets
-            JOIN sessions ON sets.session_id = sessions.id
-            WHERE sessions.exercise_id = ?
-            ORDER BY sessions.date DESC, sets.set_index DESC LIMIT 1
-        ''', (exercise_id,))
+        c = self._c
+        c.execute(SQL_LAST_SET_FOR_EXERCISE, (exercise_id,))
         r = c.fetchone()
         return r if r else (None, None, None, None)
 
@@ -172,6 +251,39 @@ class DatabaseManager:
         self.conn.close()
 
 
+# ---------------- DB worker thread ----------------
+class DBWorker(threading.Thread):
+    """Runs DatabaseManager calls on a dedicated thread so disk waits
+    never freeze the Tk main loop. Callers submit a function and get a
+    Future back; the UI polls it with root.after."""
+
+    def __init__(self, db):
+        super().__init__(daemon=True)
+        self.db = db
+        self.tasks = queue.Queue()
+        self.start()
+
+    def submit(self, fn, *args, **kwargs):
+        fut = Future()
+        self.tasks.put((fut, fn, args, kwargs))
+        return fut
+
+    def run(self):
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                break
+            fut, fn, args, kwargs = task
+            try:
+                fut.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                fut.set_exception(e)
+
+    def stop(self):
+        self.tasks.put(None)
+        self.join()
+
+
 def safe_date_str(dt=None):
     if dt is None:
         dt = datetime.now()
@@ -202,6 +314,7 @@ class TrackerApp:
     def __init__(self, root, db):
         self.root = root
         self.db = db
+        self.db_worker = DBWorker(db)
 
         # UI setup
         root.title("CejFIT")
@@ -236,15 +349,37 @@ class TrackerApp:
         # Build UI
         self.set_buffer = []
         self.exercises = []
+        self._ex_by_id = {}
+        self._search_job = None
+        self._resize_job = None
 
         self._build_left()
         self._build_right_top()
         self._build_right_bottom()
 
-        self.refresh_exercises()
-        self._set_initial_sashes()
+        # defer the initial DB load and sash placement so the window maps
+        # immediately; both run once the event loop is idle
+        root.after_idle(self.refresh_exercises)
+        root.after_idle(self._set_initial_sashes)
         root.bind("<Configure>", self._on_root_configure)
 
+    # --- DB dispatch ---
+    def _db_call(self, fn, *args, callback=None):
+        fut = self.db_worker.submit(fn, *args)
+        self.root.after(20, self._poll_future, fut, callback)
+
+    def _poll_future(self, fut, callback):
+        if not fut.done():
+            self.root.after(20, self._poll_future, fut, callback)
+            return
+        try:
+            result = fut.result()
+        except Exception as e:
+            messagebox.showerror('Error', str(e))
+            return
+        if callback:
+            callback(result)
+
     # --- UI Builders ---
     def _styled_btn(self, parent, text, cmd, width=None):
         b = tk.Button(parent, text=text, command=cmd, bg=self.button, fg='white',
@@ -285,7 +420,7 @@ class TrackerApp:
                 except: pass
         self.sentry.bind('<FocusIn>', _on_focus_in)
         self.sentry.bind('<FocusOut>', _on_focus_out)
-        self.sentry.bind('<KeyRelease>', lambda e: self._apply_search())
+        self.sentry.bind('<KeyRelease>', lambda e: self._schedule_search())
 
         cols = ('name','last_session','body_part','equipment','notes','subgroup')
         fr = tk.Frame(self.left_frame, bg=self.panel)
@@ -337,12 +472,13 @@ class TrackerApp:
         leftcol.pack(side='left', anchor='n')
 
         tk.Label(leftcol, text="Date", bg=self.panel).pack(anchor='w')
-        if TKCAL_AVAILABLE:
-            self.date_widget = DateEntry(leftcol, width=14, date_pattern='yyyy-mm-dd')
-        else:
-            self.date_widget = ttk.Entry(leftcol, width=14)
-            self.date_widget.insert(0, safe_date_str())
+        # start with a plain entry; tkcalendar imports slowly (Babel locale
+        # data), so it is loaded and swapped in once the window is up
+        self._date_col = leftcol
+        self.date_widget = ttk.Entry(leftcol, width=14)
+        self.date_widget.insert(0, safe_date_str())
         self.date_widget.pack(pady=(6,0))
+        self.root.after_idle(self._upgrade_date_widget)
 
         notescol = tk.Frame(row1, bg=self.panel)
         notescol.pack(side='left', fill='x', expand=True, padx=(12,0))
@@ -379,6 +515,20 @@ class TrackerApp:
         self._styled_btn(sc, "Remove Set", self.remove_set).pack(side='left', padx=6)
         self._styled_btn(sc, "Save Session", self.save_session).pack(side='right', padx=6)
 
+    def _upgrade_date_widget(self):
+        try:
+            from tkcalendar import DateEntry
+        except Exception:
+            return
+        current = self.date_widget.get().strip()
+        self.date_widget.destroy()
+        self.date_widget = DateEntry(self._date_col, width=14, date_pattern='yyyy-mm-dd')
+        try:
+            self.date_widget.set_date(current or safe_date_str())
+        except Exception:
+            pass
+        self.date_widget.pack(pady=(6,0))
+
     # Bottom right UI
     def _build_right_bottom(self):
         tk.Label(self.right_bottom, text="Progress History", bg=self.panel, font=("Helvetica",11,"bold")).pack(anchor='w')
@@ -431,9 +581,14 @@ class TrackerApp:
             pass
 
     def _on_root_configure(self, event):
-        self._resize_master_columns()
+        # <Configure> fires per pixel while dragging; only recompute the
+        # column widths once the resize settles
+        if self._resize_job:
+            self.root.after_cancel(self._resize_job)
+        self._resize_job = self.root.after(50, self._resize_master_columns)
 
     def _resize_master_columns(self):
+        self._resize_job = None
         try:
             total_width = self.left_frame.winfo_width() - 30
             if total_width < 300:
@@ -445,84 +600,87 @@ class TrackerApp:
             pass
 
     def refresh_exercises(self):
-        for iid in self.ex_table.get_children():
-            self.ex_table.delete(iid)
-        self.exercises = self.db.get_exercises()
+        self._db_call(self.db.get_exercise_summaries, callback=self._on_exercises_loaded)
+
+    def _on_exercises_loaded(self, rows):
+        # clear in one Tcl call rather than one delete per row
+        self.ex_table.delete(*self.ex_table.get_children())
+        self.exercises = rows
+        self._ex_by_id = {e.id: e for e in rows}
         for e in self.exercises:
-            last = e[6] if len(e) > 6 and e[6] is not None else ''
-            self.ex_table.insert('', 'end', iid=str(e[0]), values=(e[1], last, e[2] or '', e[3] or '', e[4] or '', e[5] or ''))
+            self._insert_exercise_row(e)
         children = self.ex_table.get_children()
         if children:
             self.ex_table.selection_set(children[0])
             self.ex_table.see(children[0])
             self.on_ex_select()
 
+    def _insert_exercise_row(self, e):
+        last = e.last_session if e.last_session is not None else ''
+        self.ex_table.insert('', 'end', iid=str(e.id),
+                             values=(e.name, last, e.body_part or '', e.equipment or '',
+                                     e.notes or '', e.subgroup or ''))
+
+    def _schedule_search(self):
+        # debounce: only filter once typing pauses, not on every keystroke
+        if self._search_job:
+            self.root.after_cancel(self._search_job)
+        self._search_job = self.root.after(120, self._apply_search)
+
     def _apply_search(self):
+        self._search_job = None
         q = self.search_var.get().strip().lower()
-        if q == "" or q == "search exercises here":
-            for iid in self.ex_table.get_children():
-                self.ex_table.reattach(iid, '', 'end')
-            for e in self.exercises:
-                iid = str(e[0])
-                if iid in self.ex_table.get_children():
-                    continue
-                try:
-                    self.ex_table.reattach(iid, '', 'end')
-                except Exception:
-                    pass
+        if q == "search exercises here":
+            q = ""
+        if not q:
+            self._show_filtered(self.exercises)
             return
+        # push matching into SQLite (C-level LIKE) on the worker thread;
+        # the callback rebuilds the table from the result set
+        self._db_call(self.db.search_exercises, q, callback=self._show_filtered)
 
-        for iid in self.ex_table.get_children():
-            vals = self.ex_table.item(iid, 'values')
-            name = str(vals[0]).lower()
-            bp = str(vals[2]).lower()
-            notes = str(vals[4]).lower()
-            subgroup = str(vals[5]).lower()
-            if q in name or q in bp or q in notes or q in subgroup:
-                self.ex_table.reattach(iid, '', 'end')
-            else:
-                self.ex_table.detach(iid)
+    def _show_filtered(self, rows):
+        self.ex_table.delete(*self.ex_table.get_children())
+        for e in rows:
+            self._insert_exercise_row(e)
 
     def get_selected_exercise(self):
         sel = self.ex_table.selection()
         if not sel:
             return None
-        iid = int(sel[0])
-        for e in self.exercises:
-            if e[0] == iid:
-                return e
-        return None
+        return self._ex_by_id.get(int(sel[0]))
 
     def on_ex_select(self, event=None):
         sel = self.get_selected_exercise()
         if not sel:
             self.sel_label.config(text="No exercise selected")
             return
-        subgroup = sel[5] or sel[2] or ''
-        self.sel_label.config(text=f"{sel[1]} ({subgroup})")
-
-        for i in self.sessions_tree.get_children():
-            self.sessions_tree.delete(i)
-        self.sessions = self.db.get_sessions_for_exercise(sel[0])
-        for s in self.sessions:
-            sets = self.db.get_sets_for_session(s[0])
-            if sets:
-                first = sets[0]
-                wdisp = f"{first[1]} {first[4] if len(first)>4 else ''}"
-                rdisp = f"{first[2]}"
-                rirdisp = f"{first[3] if first[3] is not None else ''}"
-            else:
-                wdisp = rdisp = rirdisp = ''
-            # s is (id, date, notes)
-            self.sessions_tree.insert('', 'end', iid=str(s[0]), values=(s[1], wdisp, rdisp, rirdisp, s[2] or ''))
+        subgroup = sel.subgroup or sel.body_part or ''
+        self.sel_label.config(text=f"{sel.name} ({subgroup})")
+
+        self._db_call(self.db.get_sessions_with_first_set, sel.id,
+                      callback=self._on_sessions_loaded)
         self.set_buffer.clear()
-        for i in self.sets_tree.get_children():
-            self.sets_tree.delete(i)
+        self.sets_tree.delete(*self.sets_tree.get_children())
         try:
             self.note_entry.delete(0, tk.END)
         except Exception:
             pass
 
+    def _on_sessions_loaded(self, rows):
+        self.sessions_tree.delete(*self.sessions_tree.get_children())
+        self.sessions = [(r['id'], r['date'], r['notes']) for r in rows]
+        for r in rows:
+            # the set columns are NULL when the session has no sets
+            if r['weight'] is not None:
+                wdisp = f"{r['weight']} {r['unit'] or ''}"
+                rdisp = f"{r['reps']}"
+                rirdisp = f"{r['rir'] if r['rir'] is not None else ''}"
+            else:
+                wdisp = rdisp = rirdisp = ''
+            self.sessions_tree.insert('', 'end', iid=str(r['id']),
+                                      values=(r['date'], wdisp, rdisp, rirdisp, r['notes'] or ''))
+
     def add_set_from_quick(self):
         try:
             weight, reps = validate_weight_reps(self.q_weight.get(), self.q_reps.get())
@@ -541,21 +699,23 @@ class TrackerApp:
         sel = self.sets_tree.selection()
         if not sel:
             messagebox.showinfo('Select', 'Select a set to remove.'); return
-        for s in sel:
-            self.sets_tree.delete(s)
-        newbuf = []
-        for i,item in enumerate(self.sets_tree.get_children(), start=1):
-            vals = list(self.sets_tree.item(item,'values'))
-            weight = vals[1]; reps = vals[2]; rir = vals[3] if vals[3] != '' else None; unit = vals[4] if len(vals) > 4 else self.unit_var.get()
-            newbuf.append({'idx': i, 'weight': weight, 'reps': reps, 'rir': rir, 'unit': unit})
-            self.sets_tree.item(item, values=(i, weight, reps, rir if rir is not None else '', unit))
-        self.set_buffer = newbuf
+        # set_buffer mirrors the tree's row order, so filter it in Python
+        # by position instead of reading values back out of the widget
+        children = self.sets_tree.get_children()
+        doomed = set(sel)
+        self.set_buffer = [row for iid, row in zip(children, self.set_buffer) if iid not in doomed]
+        self.sets_tree.delete(*sel)
+        remaining = [iid for iid in children if iid not in doomed]
+        for i, (iid, row) in enumerate(zip(remaining, self.set_buffer), start=1):
+            if row['idx'] != i:
+                row['idx'] = i
+                self.sets_tree.set(iid, 'idx', i)
 
     def save_session(self):
         sel = self.get_selected_exercise()
         if not sel:
             messagebox.showinfo('Select', 'Select an exercise first.'); return
-        if TKCAL_AVAILABLE:
+        if hasattr(self.date_widget, 'get_date'):
             try:
                 date_str = self.date_widget.get_date().strftime('%Y-%m-%d')
             except Exception:
@@ -563,37 +723,51 @@ class TrackerApp:
         else:
             date_str = self.date_widget.get().strip()
         try:
-            datetime.strptime(date_str, '%Y-%m-%d')
-        except Exception:
+            date.fromisoformat(date_str)
+        except (TypeError, ValueError):
             messagebox.showerror('Invalid date', 'Date must be YYYY-MM-DD'); return
         if not self.set_buffer:
             messagebox.showinfo('No sets', 'Add at least one set before saving.'); return
         notes = self.note_entry.get().strip() if self.note_entry else ''
-        try:
-            session_id = self.db.add_session(sel[0], date_str, notes)
-            for s in self.set_buffer:
-                self.db.add_set(session_id, s['idx'], s['weight'], s['reps'], s.get('rir'), s.get('unit','lbs'))
-            messagebox.showinfo('Saved', 'Session saved.')
-            self.set_buffer.clear()
-            for i in self.sets_tree.get_children():
-                self.sets_tree.delete(i)
-            self.on_ex_select()
-            self.refresh_exercises()
-        except Exception as e:
-            messagebox.showerror('Error', str(e))
+        exercise_id = sel.id
+        sets = list(self.set_buffer)
+        def write():
+            session_id = self.db.add_session(exercise_id, date_str, notes)
+            self.db.add_sets(session_id, sets)
+            return session_id
+        self._db_call(write, callback=lambda _: self._on_session_saved(exercise_id, date_str, sets[0]))
+
+    def _on_session_saved(self, exercise_id, date_str, first_set):
+        messagebox.showinfo('Saved', 'Session saved.')
+        self.set_buffer.clear()
+        self.sets_tree.delete(*self.sets_tree.get_children())
+        # only the saved exercise's last_session changed; patch that one
+        # row in place instead of re-querying and rebuilding the table
+        ex = self._ex_by_id.get(exercise_id)
+        if ex is not None:
+            updated = ex._replace(last_session=date_str, last_weight=first_set['weight'],
+                                  last_reps=first_set['reps'], last_unit=first_set.get('unit', 'lbs'))
+            self._ex_by_id[exercise_id] = updated
+            self.exercises = [updated if e.id == exercise_id else e for e in self.exercises]
+            try:
+                self.ex_table.set(str(exercise_id), 'last_session', date_str)
+            except Exception:
+                pass
+        self.on_ex_select()
 
     def on_session_select(self, event=None):
         sel = self.sessions_tree.selection()
         if not sel:
             return
         sid = int(sel[0])
-        for i in self.sets_tree.get_children():
-            self.sets_tree.delete(i)
-        sets = self.db.get_sets_for_session(sid)
+        self._db_call(self.db.get_sets_for_session, sid, callback=self._on_session_sets_loaded)
+
+    def _on_session_sets_loaded(self, sets):
+        self.sets_tree.delete(*self.sets_tree.get_children())
         self.set_buffer = []
         for s in sets:
             # s may contain notes in DB but UI only uses first five fields
-            idx, weight, reps, rir, unit = s[0], s[1], s[2], s[3], s[4]
+            idx, weight, reps, rir, unit = s['set_index'], s['weight'], s['reps'], s['rir'], s['unit']
             self.sets_tree.insert('', 'end', values=(idx, weight, reps, rir if rir is not None else '', unit))
             self.set_buffer.append({'idx': idx, 'weight': weight, 'reps': reps, 'rir': rir, 'unit': unit})
 
@@ -603,51 +777,47 @@ class TrackerApp:
             messagebox.showinfo('Select', 'Select session to delete.'); return
         sid = int(sel[0])
         if messagebox.askyesno('Confirm', 'Delete this session?'):
-            try:
-                self.db.delete_session(sid)
+            def done(_):
                 self.on_ex_select()
                 messagebox.showinfo('Deleted', 'Session removed.')
-            except Exception as e:
-                messagebox.showerror('Error', str(e))
+            self._db_call(self.db.delete_session, sid, callback=done)
 
     def add_exercise_dialog(self):
         d = ExerciseEditDialog(self.root, title='Add Exercise')
         if d.result:
             try:
                 name = validate_exercise_name(d.result['name'])
-                self.db.add_exercise(name, d.result.get('body_part',''), d.result.get('equipment',''),
-                                     d.result.get('notes',''), d.result.get('subgroup',''))
-                self.refresh_exercises()
             except Exception as e:
-                messagebox.showerror('Error', str(e))
+                messagebox.showerror('Error', str(e)); return
+            self._db_call(self.db.add_exercise, name, d.result.get('body_part',''),
+                          d.result.get('equipment',''), d.result.get('notes',''),
+                          d.result.get('subgroup',''),
+                          callback=lambda _: self.refresh_exercises())
 
     def edit_exercise_dialog(self, event=None):
         sel = self.get_selected_exercise()
         if not sel:
             self.messagebox.showinfo('Select', 'Select an exercise to edit.'); return
-        initial = {'name': sel[1], 'body_part': sel[2] or '', 'equipment': sel[3] or '',
-                   'notes': sel[4] or '', 'subgroup': sel[5] or ''}
+        initial = {'name': sel.name, 'body_part': sel.body_part or '', 'equipment': sel.equipment or '',
+                   'notes': sel.notes or '', 'subgroup': sel.subgroup or ''}
         d = ExerciseEditDialog(self.root, title='Edit Exercise', initial=initial)
         if d.result:
             try:
                 name = validate_exercise_name(d.result['name'])
-                self.db.update_exercise(sel[0], name, d.result.get('body_part',''),
-                                        d.result.get('equipment',''), d.result.get('notes',''),
-                                        d.result.get('subgroup',''))
-                self.refresh_exercises()
             except Exception as e:
-                messagebox.showerror('Error', str(e))
+                messagebox.showerror('Error', str(e)); return
+            self._db_call(self.db.update_exercise, sel.id, name, d.result.get('body_part',''),
+                          d.result.get('equipment',''), d.result.get('notes',''),
+                          d.result.get('subgroup',''),
+                          callback=lambda _: self.refresh_exercises())
 
     def delete_exercise_confirm(self):
         sel = self.get_selected_exercise()
         if not sel:
             messagebox.showinfo('Select', 'Select an exercise to delete.'); return
-        if messagebox.askyesno('Confirm', f'Delete exercise "{sel[1]}" and all sessions?'):
-            try:
-                self.db.delete_exercise(sel[0])
-                self.refresh_exercises()
-            except Exception as e:
-                messagebox.showerror('Error', str(e))
+        if messagebox.askyesno('Confirm', f'Delete exercise "{sel.name}" and all sessions?'):
+            self._db_call(self.db.delete_exercise, sel.id,
+                          callback=lambda _: self.refresh_exercises())
 
 
 # ---------------- Exercise edit dialog ----------------
@@ -711,7 +881,7 @@ def main():
     y = max(0, int((sh - h) / 2))
     root.geometry(f"{w}x{h}+{x}+{y}")
 
-    root.protocol("WM_DELETE_WINDOW", lambda: (db.close(), root.destroy()))
+    root.protocol("WM_DELETE_WINDOW", lambda: (app.db_worker.stop(), db.close(), root.destroy()))
     root.mainloop()
 
 